@@ -0,0 +1,106 @@
+import json
+from typing import Dict, List, Optional
+
+from content_generator import ContentGenerator
+
+class BatchGenerator:
+    """
+    Pre-generates expert threads through the OpenAI Batch API.
+
+    Batch requests are billed at half the realtime price. Completed results are written
+    to the content generator's response cache, so the scheduled posting jobs pick them up
+    as cache hits and only fall back to a realtime call on a miss.
+    """
+
+    MODEL = "gpt-4"
+    MAX_TOKENS = 1000
+
+    def __init__(self, content_generator: ContentGenerator):
+        """
+        Initialize the batch generator.
+
+        Args:
+            content_generator (ContentGenerator): Generator whose client and cache are used
+        """
+        self.content_generator = content_generator
+        self.pending_batches: List[str] = []
+
+    def _batch_line(self, focus_area: str) -> Dict:
+        """Build a single Batch API request line for an expert thread."""
+        generator = self.content_generator
+        system_prompt, user_prompt = generator._expert_thread_prompts(focus_area)
+
+        return {
+            # The cache key doubles as the custom_id so results map straight back into the cache
+            "custom_id": generator._cache_key(self.MODEL, system_prompt, user_prompt),
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": generator._completion_request(self.MODEL, system_prompt, user_prompt, self.MAX_TOKENS)
+        }
+
+    def submit(self, focus_areas: List[str]) -> Optional[str]:
+        """
+        Submit a batch job generating expert threads for the given focus areas.
+
+        Args:
+            focus_areas (List[str]): Focus areas due to be posted soon
+
+        Returns:
+            Optional[str]: The batch ID, or None if every thread was already cached
+        """
+        lines = [self._batch_line(focus_area) for focus_area in focus_areas]
+        lines = [line for line in lines if self.content_generator._cache_get(line["custom_id"]) is None]
+
+        if not lines:
+            print("All upcoming expert threads are already cached")
+            return None
+
+        payload = "\n".join(json.dumps(line) for line in lines).encode()
+        client = self.content_generator.client
+
+        input_file = client.files.create(file=("expert_threads.jsonl", payload), purpose="batch")
+        batch = client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+
+        self.pending_batches.append(batch.id)
+        print(f"Submitted batch {batch.id} with {len(lines)} expert threads")
+        return batch.id
+
+    def poll(self):
+        """Check pending batches and cache the results of any that have completed."""
+        client = self.content_generator.client
+
+        for batch_id in list(self.pending_batches):
+            batch = client.batches.retrieve(batch_id)
+
+            if batch.status == "completed":
+                self.pending_batches.remove(batch_id)
+                if batch.output_file_id:
+                    cached = self._store_results(client.files.content(batch.output_file_id).text)
+                    print(f"Batch {batch_id} completed, cached {cached} expert threads")
+
+            elif batch.status in ("failed", "expired", "cancelled"):
+                self.pending_batches.remove(batch_id)
+                print(f"Batch {batch_id} ended with status '{batch.status}', falling back to realtime generation")
+
+    def _store_results(self, output: str) -> int:
+        """Write successful batch results into the response cache."""
+        cached = 0
+
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+
+            result = json.loads(line)
+            response = result.get("response")
+            if not response or response.get("status_code") != 200:
+                continue
+
+            content = response["body"]["choices"][0]["message"]["content"]
+            self.content_generator._cache_put(result["custom_id"], content)
+            cached += 1
+
+        return cached
@@ -0,0 +1,34 @@
+import os
+import sys
+import logging
+from typing import List, Optional, Union
+
+# Environment variables the bot cannot run without
+REQUIRED_ENV = frozenset({
+    'OPENAI_API_KEY',
+    'TWITTER_API_KEY',
+    'TWITTER_API_SECRET',
+    'TWITTER_ACCESS_TOKEN',
+    'TWITTER_ACCESS_TOKEN_SECRET',
+    'TWITTER_BEARER_TOKEN'
+})
+
+def missing_env() -> List[str]:
+    """Return the required environment variables that are unset or empty, sorted by name."""
+    return sorted(REQUIRED_ENV.difference(name for name, value in os.environ.items() if value))
+
+def configure_logging(level: Union[int, str] = logging.INFO, filename: Optional[str] = None):
+    """
+    Route the bot's log records to stdout, or to a file.
+    
+    Args:
+        level (Union[int, str]): Minimum level to emit, e.g. logging.DEBUG or "DEBUG"
+        filename (Optional[str]): Log file path; records go to stdout when omitted
+    """
+    handler = logging.FileHandler(filename) if filename else logging.StreamHandler(sys.stdout)
+    logging.basicConfig(
+        level=level,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+        handlers=[handler],
+        force=True
+    )
@@ -1,10 +1,281 @@
 import os
-from openai import OpenAI
-from typing import Dict, List, Optional
+import json
+import math
+import random
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import defaultdict, deque
+from openai import AsyncOpenAI, OpenAI
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+class StructuralCache:
+    """
+    Caches one expert thread per (category, prompt template) pair.
+
+    Focus areas in the same category share the same prompt template, so a cached thread
+    can be rewritten for a sibling focus area instead of generating a new one from scratch.
+    Shadow-sampling statistics track how often such rewrites drift from a real generation.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, lock: threading.Lock):
+        """
+        Initialize the structural cache on an existing SQLite connection.
+        
+        Args:
+            conn (sqlite3.Connection): Connection to the response cache database
+            lock (threading.Lock): Lock serializing access to the connection
+        """
+        self._conn = conn
+        self._lock = lock
+        self.hits = 0
+        self.shadow_samples = 0
+        self.incorrect_hits = 0
+
+        with self._lock:
+            self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS structural_cache (
+                category TEXT NOT NULL,
+                template_hash TEXT NOT NULL,
+                focus_area TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (category, template_hash)
+            )
+            """)
+            self._conn.commit()
+
+    def get(self, category: str, template_hash: str) -> Optional[Tuple[str, str]]:
+        """Return the cached (focus_area, response) template for a category, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT focus_area, response FROM structural_cache WHERE category = ? AND template_hash = ?",
+                (category, template_hash)
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def put(self, category: str, template_hash: str, focus_area: str, response: str):
+        """Store a freshly generated thread as the template for its category."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO structural_cache (category, template_hash, focus_area, response, created_at) "
+                "VALUES (?, ?, ?, ?, datetime('now'))",
+                (category, template_hash, focus_area, response)
+            )
+            self._conn.commit()
+
+    def record_shadow_sample(self, correct: bool):
+        """Record the outcome of comparing a rewritten thread against a real generation."""
+        self.shadow_samples += 1
+        if not correct:
+            self.incorrect_hits += 1
+
+    @property
+    def incorrect_hit_rate(self) -> float:
+        """Fraction of shadow-sampled rewrites that drifted too far from a real generation."""
+        return self.incorrect_hits / self.shadow_samples if self.shadow_samples else 0.0
 
 class ContentGenerator:
-    def __init__(self):
+    # Cached responses older than this are regenerated
+    CACHE_TTL_DAYS = 7
+    # Maximum number of concurrent OpenAI requests for batch generation
+    MAX_CONCURRENT_REQUESTS = 10
+    # Short tweet-style prompts are routed to a smaller, faster model while it has budget left
+    DEFAULT_MODEL = "gpt-3.5-turbo"
+    FAST_MODEL = "gpt-4o-mini"
+    FAST_MODEL_RPM = 500
+    FAST_TASKS = frozenset({"tweet", "trending_response"})
+
+    # Rewrites of cached sibling threads are shadow-checked against a real gpt-4 generation
+    # at this rate, and count as incorrect below this embedding similarity
+    SHADOW_SAMPLE_RATE = 0.1
+    SHADOW_SIMILARITY_THRESHOLD = 0.85
+    EMBEDDING_MODEL = "text-embedding-3-small"
+
+    _REWRITE_SYSTEM_PROMPT = """You rewrite Twitter threads for a new topic. Given a thread about one topic, rewrite it about the new topic while:
+        - Keeping the same number of tweets, one per line, in the same order
+        - Preserving each tweet's role, structure, tone, emoji usage and approximate length
+        - Replacing facts, examples, tools and hashtags so they are accurate for the new topic
+        - Keeping every tweet under 280 characters
+        Output only the rewritten tweets, with no commentary."""
+
+    # Kept identical across calls so the system prompt stays a stable prefix
+    _EXPERT_SYSTEM_PROMPT_STATIC = """You are a leading AI researcher and industry expert. Create a thread of 5 tweets about the focus area given by the user that follows this specific structure:
+
+        Tweet 1 (Hook): 
+        - Start with a powerful statistic, surprising fact, or thought-provoking question
+        - Create immediate interest in the topic
+        - Use 🔥 or 💡 to grab attention
+
+        Tweet 2 (Context & Problem):
+        - Explain why this topic matters NOW
+        - Highlight current challenges or pain points
+        - Include specific industry examples
+        - Use 🎯 or 🌟 for key points
+
+        Tweet 3 (Technical Insight):
+        - Share deep technical knowledge that's not commonly known
+        - Include specific implementation details or architectural insights
+        - Cite recent research or developments
+        - Use 🔧 or 🧠 for technical concepts
+
+        Tweet 4 (Practical Application):
+        - Provide 2-3 actionable takeaways
+        - Include code examples or specific tools when relevant
+        - Focus on immediate implementation
+        - Use ⚡ or 💻 for practical tips
+
+        Tweet 5 (Future Impact & CTA):
+        - Predict future developments
+        - Include a clear call-to-action
+        - Add 3-4 relevant hashtags
+        - Use 🚀 or 🔮 for future predictions
+
+        Requirements for ALL tweets:
+        1. Each must be under 280 characters
+        2. Use data points and specific examples
+        3. Maintain a balance between technical depth and accessibility
+        4. Include relevant links to tools/research when applicable
+        5. Use consistent narrative threading
+
+        Output format:
+        - Return exactly 5 tweets, one per line, in thread order
+        - Do not number the tweets or prefix them with labels such as "Tweet 1:" or "Hook:"
+        - Do not wrap tweets in quotation marks, markdown, or code fences
+        - Do not add any introduction, summary, or commentary before or after the thread
+        - Keep each tweet on a single line; use " - " or " | " instead of line breaks inside a tweet"""
+
+    def __init__(self, cache_path: str = "data/llm_cache.db"):
+        """
+        Initialize the content generator with OpenAI clients and a persistent response cache.
+        
+        Args:
+            cache_path (str): Path to the SQLite database holding cached completions
+        """
         self.client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        self.aclient = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        self._model_calls: Dict[str, Deque[float]] = defaultdict(deque)
+        os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+        # Scheduled jobs run in worker threads, so access to the cache connection is serialized
+        self._cache_lock = threading.Lock()
+        self._cache = sqlite3.connect(cache_path, check_same_thread=False)
+        self._cache.execute("""
+        CREATE TABLE IF NOT EXISTS llm_cache (
+            key TEXT PRIMARY KEY,
+            response TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            ttl INTEGER
+        )
+        """)
+        self._cache.commit()
+
+        self.structural_cache = StructuralCache(self._cache, self._cache_lock)
+        self._expert_template_hash = hashlib.sha256(self._EXPERT_SYSTEM_PROMPT_STATIC.encode()).hexdigest()
+
+    def _cache_key(self, model: str, system_prompt: str, user_prompt: str) -> str:
+        """Build a stable cache key for a deterministic (temperature 0) completion."""
+        payload = {"model": model, "system": system_prompt, "user": user_prompt, "temp": 0.0}
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def _has_budget(self, model: str, rpm: int) -> bool:
+        """Check whether a model has made fewer than rpm requests in the last minute."""
+        calls = self._model_calls[model]
+        cutoff = time.monotonic() - 60
+        while calls and calls[0] < cutoff:
+            calls.popleft()
+        return len(calls) < rpm
+
+    def _select_model(self, prompt: str, task: str) -> str:
+        """
+        Pick a model based on prompt complexity and current load.
+        
+        Args:
+            prompt (str): The user prompt being sent
+            task (str): The kind of content being generated (e.g. 'tweet', 'trending_response')
+        
+        Returns:
+            str: The model to use
+        """
+        if len(prompt) < 200 and task in self.FAST_TASKS and self._has_budget(self.FAST_MODEL, self.FAST_MODEL_RPM):
+            return self.FAST_MODEL
+        return self.DEFAULT_MODEL
+
+    def _completion_request(self, model: str, system_prompt: str, user_prompt: str, max_tokens: int) -> Dict:
+        """Build the chat completion payload used for cacheable (temperature 0) calls."""
+        return {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            "max_tokens": max_tokens,
+            "temperature": 0.0
+        }
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        """Return a cached completion if one exists and has not expired."""
+        with self._cache_lock:
+            row = self._cache.execute(
+                "SELECT response FROM llm_cache WHERE key = ? AND created_at > datetime('now', ?)",
+                (key, f'-{self.CACHE_TTL_DAYS} days')
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _cache_put(self, key: str, content: str):
+        """Store a completion in the cache."""
+        with self._cache_lock:
+            self._cache.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, response, created_at, ttl) VALUES (?, ?, datetime('now'), ?)",
+                (key, json.dumps(content), self.CACHE_TTL_DAYS * 86400)
+            )
+            self._cache.commit()
+
+    def _cached_completion(self, model: str, system_prompt: str, user_prompt: str, max_tokens: int) -> str:
+        """
+        Run a chat completion, returning a cached response when available.
+        
+        Cached calls are made at temperature 0 so the same prompt always maps to the same response.
+        
+        Args:
+            model (str): OpenAI model name
+            system_prompt (str): System message content
+            user_prompt (str): User message content
+            max_tokens (int): Maximum tokens to generate
+        
+        Returns:
+            str: The completion text
+        """
+        key = self._cache_key(model, system_prompt, user_prompt)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        self._model_calls[model].append(time.monotonic())
+        response = self.client.chat.completions.create(
+            **self._completion_request(model, system_prompt, user_prompt, max_tokens)
+        )
+
+        content = response.choices[0].message.content
+        self._cache_put(key, content)
+        return content
+
+    async def _acached_completion(self, model: str, system_prompt: str, user_prompt: str, max_tokens: int) -> str:
+        """Async variant of _cached_completion using the AsyncOpenAI client."""
+        key = self._cache_key(model, system_prompt, user_prompt)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        self._model_calls[model].append(time.monotonic())
+        response = await self.aclient.chat.completions.create(
+            **self._completion_request(model, system_prompt, user_prompt, max_tokens)
+        )
+
+        content = response.choices[0].message.content
+        self._cache_put(key, content)
+        return content
 
     def generate_tweet(self, prompt: str, tone: str = "professional", include_hashtags: bool = True) -> str:
         """
@@ -26,17 +297,26 @@ class ContentGenerator:
         {"- Include 2-3 relevant hashtags at the end" if include_hashtags else ""}
         """
 
-        response = self.client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"Create a tweet about: {prompt}"}
-            ],
-            max_tokens=150,
-            temperature=0.7
+        user_prompt = f"Create a tweet about: {prompt}"
+        content = self._cached_completion(
+            self._select_model(user_prompt, "tweet"),
+            system_prompt,
+            user_prompt,
+            max_tokens=150
         )
         
-        return response.choices[0].message.content.strip()
+        return content.strip()
+
+    def _value_thread_prompts(self, topic: str, num_tweets: int) -> Tuple[str, str]:
+        """Build the system and user prompts for a value thread."""
+        system_prompt = f"""Create a thread of {num_tweets} tweets about {topic}. Each tweet should:
+        - Provide valuable, actionable insights
+        - Be engaging and informative
+        - Be under 280 characters
+        - Flow naturally from one tweet to the next
+        """
+
+        return system_prompt, f"Create a thread about: {topic}"
 
     def generate_value_thread(self, topic: str, num_tweets: int = 5) -> List[str]:
         """
@@ -49,27 +329,29 @@ class ContentGenerator:
         Returns:
             List[str]: List of tweets forming a thread
         """
-        system_prompt = f"""Create a thread of {num_tweets} tweets about {topic}. Each tweet should:
-        - Provide valuable, actionable insights
-        - Be engaging and informative
-        - Be under 280 characters
-        - Flow naturally from one tweet to the next
-        """
-
-        response = self.client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"Create a thread about: {topic}"}
-            ],
-            max_tokens=500,
-            temperature=0.7
-        )
+        system_prompt, user_prompt = self._value_thread_prompts(topic, num_tweets)
+        content = self._cached_completion(self.DEFAULT_MODEL, system_prompt, user_prompt, max_tokens=500)
 
         # Split the response into individual tweets
-        tweets = [tweet.strip() for tweet in response.choices[0].message.content.split('\n') if tweet.strip()]
+        tweets = [tweet.strip() for tweet in content.split('\n') if tweet.strip()]
         return tweets
 
+    async def agenerate_value_thread(self, topic: str, num_tweets: int = 5) -> List[str]:
+        """
+        Async variant of generate_value_thread.
+        
+        Args:
+            topic (str): The main topic for the thread
+            num_tweets (int): Number of tweets in the thread
+        
+        Returns:
+            List[str]: List of tweets forming a thread
+        """
+        system_prompt, user_prompt = self._value_thread_prompts(topic, num_tweets)
+        content = await self._acached_completion(self.DEFAULT_MODEL, system_prompt, user_prompt, max_tokens=500)
+
+        return [tweet.strip() for tweet in content.split('\n') if tweet.strip()]
+
     def generate_trending_response(self, trend: str, product_context: str) -> str:
         """
         Generate a response to a trending topic that naturally incorporates product promotion.
@@ -84,77 +366,178 @@ class ContentGenerator:
         system_prompt = """Create a tweet that naturally connects a trending topic with our product/service.
         The connection should feel organic and not forced. The tweet should be engaging and under 280 characters."""
 
-        response = self.client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"Trending topic: {trend}\nProduct context: {product_context}"}
-            ],
-            max_tokens=150,
-            temperature=0.7
+        user_prompt = f"Trending topic: {trend}\nProduct context: {product_context}"
+        content = self._cached_completion(
+            self._select_model(user_prompt, "trending_response"),
+            system_prompt,
+            user_prompt,
+            max_tokens=150
         )
 
-        return response.choices[0].message.content.strip()
+        return content.strip()
 
-    def generate_ai_expert_thread(self, focus_area: str) -> List[str]:
+    def _expert_thread_prompts(self, focus_area: str) -> Tuple[str, str]:
+        """
+        Build the system and user prompts for an expert thread.
+        
+        The system prompt is a static constant; only the user message varies with the focus area.
+        """
+        return self._EXPERT_SYSTEM_PROMPT_STATIC, f"Focus area: {focus_area}"
+
+    def _similarity(self, a: str, b: str) -> float:
+        """Cosine similarity between the embeddings of two texts."""
+        response = self.client.embeddings.create(model=self.EMBEDDING_MODEL, input=[a, b])
+        u, v = response.data[0].embedding, response.data[1].embedding
+        dot = sum(x * y for x, y in zip(u, v))
+        return dot / (math.sqrt(sum(x * x for x in u)) * math.sqrt(sum(y * y for y in v)))
+
+    def _structural_variant(self, focus_area: str, category: str) -> Optional[str]:
+        """
+        Derive an expert thread by rewriting a cached sibling thread from the same category.
+        
+        A sample of rewrites is shadow-checked against a real gpt-4 generation; the real
+        thread is returned in that case since it has already been paid for.
+        
+        Args:
+            focus_area (str): Focus area the thread should be about
+            category (str): Category the focus area belongs to
+        
+        Returns:
+            Optional[str]: The thread content, or None if the category has no usable template
+        """
+        template = self.structural_cache.get(category, self._expert_template_hash)
+        if template is None or template[0] == focus_area:
+            return None
+
+        source_focus_area, source_content = template
+        content = self._cached_completion(
+            self.DEFAULT_MODEL,
+            self._REWRITE_SYSTEM_PROMPT,
+            f"Original topic: {source_focus_area}\nNew topic: {focus_area}\n\nThread:\n{source_content}",
+            max_tokens=1000
+        )
+        self.structural_cache.hits += 1
+
+        if random.random() < self.SHADOW_SAMPLE_RATE:
+            system_prompt, user_prompt = self._expert_thread_prompts(focus_area)
+            actual = self._cached_completion("gpt-4", system_prompt, user_prompt, max_tokens=1000)
+            correct = self._similarity(content, actual) >= self.SHADOW_SIMILARITY_THRESHOLD
+            self.structural_cache.record_shadow_sample(correct)
+            print(f"Structural cache shadow check for '{focus_area}': {'ok' if correct else 'drifted'} "
+                  f"(incorrect hit rate {self.structural_cache.incorrect_hit_rate:.0%})")
+            return actual
+
+        return content
+
+    def generate_ai_expert_thread(self, focus_area: str, category: Optional[str] = None) -> List[str]:
         """
         Generate an expert-level thread about AI technology with deep insights.
         
         Args:
             focus_area (str): Specific area of AI to focus on (e.g., 'LLMs', 'Computer Vision', etc.)
+            category (Optional[str]): Category of the focus area; enables reuse of sibling threads
         
         Returns:
             List[str]: List of tweets forming a high-quality thread
         """
-        system_prompt = f"""You are a leading AI researcher and industry expert. Create a thread of 5 tweets about {focus_area} that follows this specific structure:
+        system_prompt, user_prompt = self._expert_thread_prompts(focus_area)
+        key = self._cache_key("gpt-4", system_prompt, user_prompt)
 
-        Tweet 1 (Hook): 
-        - Start with a powerful statistic, surprising fact, or thought-provoking question
-        - Create immediate interest in the topic
-        - Use 🔥 or 💡 to grab attention
+        # Rewrites are cached under their own (rewrite model) key, never under the gpt-4 key,
+        # so batch pre-generation still produces the real thread for this focus area
+        content = self._cache_get(key)
+        if content is None and category:
+            content = self._structural_variant(focus_area, category)
 
-        Tweet 2 (Context & Problem):
-        - Explain why this topic matters NOW
-        - Highlight current challenges or pain points
-        - Include specific industry examples
-        - Use 🎯 or 🌟 for key points
+        if content is None:
+            content = self._cached_completion("gpt-4", system_prompt, user_prompt, max_tokens=1000)
+            if category:
+                self.structural_cache.put(category, self._expert_template_hash, focus_area, content)
 
-        Tweet 3 (Technical Insight):
-        - Share deep technical knowledge that's not commonly known
-        - Include specific implementation details or architectural insights
-        - Cite recent research or developments
-        - Use 🔧 or 🧠 for technical concepts
+        # Split and clean the tweets
+        return [tweet.strip() for tweet in content.split('\n') if tweet.strip()]
 
-        Tweet 4 (Practical Application):
-        - Provide 2-3 actionable takeaways
-        - Include code examples or specific tools when relevant
-        - Focus on immediate implementation
-        - Use ⚡ or 💻 for practical tips
+    def igenerate_ai_expert_thread(self, focus_area: str, category: Optional[str] = None) -> Iterator[str]:
+        """
+        Stream an expert thread, yielding each tweet as soon as it has been generated.
+        
+        Args:
+            focus_area (str): Specific area of AI to focus on
+            category (Optional[str]): Category of the focus area; enables reuse of sibling threads
+        
+        Yields:
+            str: The next tweet in the thread
+        """
+        model = "gpt-4"
+        system_prompt, user_prompt = self._expert_thread_prompts(focus_area)
+        key = self._cache_key(model, system_prompt, user_prompt)
 
-        Tweet 5 (Future Impact & CTA):
-        - Predict future developments
-        - Include a clear call-to-action
-        - Add 3-4 relevant hashtags
-        - Use 🚀 or 🔮 for future predictions
+        cached = self._cache_get(key)
+        if cached is None and category:
+            cached = self._structural_variant(focus_area, category)
 
-        Requirements for ALL tweets:
-        1. Each must be under 280 characters
-        2. Use data points and specific examples
-        3. Maintain a balance between technical depth and accessibility
-        4. Include relevant links to tools/research when applicable
-        5. Use consistent narrative threading
+        if cached is not None:
+            yield from (tweet.strip() for tweet in cached.split('\n') if tweet.strip())
+            return
+
+        self._model_calls[model].append(time.monotonic())
+        content = []
+        buffer = ""
+
+        with self.client.chat.completions.create(
+            **self._completion_request(model, system_prompt, user_prompt, max_tokens=1000),
+            stream=True
+        ) as stream:
+            for chunk in stream:
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+
+                delta = chunk.choices[0].delta.content
+                content.append(delta)
+                buffer += delta
+
+                # Emit every completed line, keeping the partial tail in the buffer
+                *lines, buffer = buffer.split('\n')
+                for line in lines:
+                    if line.strip():
+                        yield line.strip()
+
+        if buffer.strip():
+            yield buffer.strip()
+
+        self._cache_put(key, "".join(content))
+        if category:
+            self.structural_cache.put(category, self._expert_template_hash, focus_area, "".join(content))
+
+    async def agenerate_ai_expert_thread(self, focus_area: str) -> List[str]:
         """
+        Async variant of generate_ai_expert_thread.
+        
+        Args:
+            focus_area (str): Specific area of AI to focus on
+        
+        Returns:
+            List[str]: List of tweets forming a high-quality thread
+        """
+        system_prompt, user_prompt = self._expert_thread_prompts(focus_area)
+        content = await self._acached_completion("gpt-4", system_prompt, user_prompt, max_tokens=1000)
 
-        response = self.client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"Create an expert thread about {focus_area} in AI technology"}
-            ],
-            max_tokens=1000,
-            temperature=0.8  # Slightly increased for more creative variations
-        )
+        return [tweet.strip() for tweet in content.split('\n') if tweet.strip()]
 
-        # Split and clean the tweets
-        tweets = [tweet.strip() for tweet in response.choices[0].message.content.split('\n') if tweet.strip()]
-        return tweets 
\ No newline at end of file
+    async def agenerate_all(self, focus_areas: List[str]) -> List[List[str]]:
+        """
+        Generate expert threads for many focus areas concurrently.
+        
+        Args:
+            focus_areas (List[str]): Focus areas to generate threads for
+        
+        Returns:
+            List[List[str]]: One thread per focus area, in the same order
+        """
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+
+        async def generate(focus_area: str) -> List[str]:
+            async with semaphore:
+                return await self.agenerate_ai_expert_thread(focus_area)
+
+        return await asyncio.gather(*[generate(focus_area) for focus_area in focus_areas])
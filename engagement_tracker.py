@@ -1,9 +1,62 @@
 import sqlite3
 import json
-from datetime import datetime
-from typing import Dict, List, Optional
+import threading
+import zlib
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
 
 class EngagementTracker:
+    # Statements are built once and reused; sqlite3 caches their compiled form per connection
+    _SQL_INSERT_METRICS = """
+        INSERT INTO engagement_metrics 
+        (tweet_id, likes, retweets, replies, impressions, collected_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """
+
+    _SQL_BEST_PERFORMING = """
+        SELECT 
+            t.id,
+            t.content,
+            t.type,
+            t.created_at,
+            m.likes,
+            m.retweets,
+            m.replies,
+            m.impressions
+        FROM engagement_metrics m
+        JOIN tweets t ON t.id = m.tweet_id
+        WHERE m.rowid = (
+            SELECT rowid FROM engagement_metrics
+            WHERE tweet_id = m.tweet_id
+            ORDER BY collected_at DESC
+            LIMIT 1
+        )
+        ORDER BY m.score DESC
+        LIMIT ?
+    """
+
+    # The cutoff is bound as an ISO string so the range can use idx_tweets_created
+    _SQL_RECENT_TWEET_IDS = """
+        SELECT id FROM tweets
+        WHERE created_at >= ?
+        ORDER BY created_at DESC
+        LIMIT ?
+    """
+
+    _SQL_PERFORMANCE_STATS = """
+        SELECT 
+            t.type,
+            AVG(m.likes) as avg_likes,
+            AVG(m.retweets) as avg_retweets,
+            AVG(m.replies) as avg_replies,
+            AVG(m.impressions) as avg_impressions,
+            COUNT(*) as total_posts
+        FROM tweets t
+        JOIN engagement_metrics m ON t.id = m.tweet_id
+        WHERE datetime(t.created_at) >= datetime('now', ?)
+        GROUP BY t.type
+    """
+
     def __init__(self, db_path: str = "data/engagement.db"):
         """
         Initialize the engagement tracker with a SQLite database.
@@ -12,39 +65,65 @@ class EngagementTracker:
             db_path (str): Path to the SQLite database file
         """
         self.db_path = db_path
+        self._lock = threading.Lock()
+
+        # A single long-lived connection shared by all threads, serialized by the lock
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA cache_size=-64000")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+
         self._init_db()
 
     def _init_db(self):
         """Initialize the database with required tables."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Create tweets table
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS tweets (
-            id TEXT PRIMARY KEY,
-            content TEXT NOT NULL,
-            type TEXT NOT NULL,
-            created_at TEXT NOT NULL,
-            metadata TEXT
-        )
-        """)
-
-        # Create engagement metrics table
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS engagement_metrics (
-            tweet_id TEXT,
-            likes INTEGER,
-            retweets INTEGER,
-            replies INTEGER,
-            impressions INTEGER,
-            collected_at TEXT NOT NULL,
-            FOREIGN KEY (tweet_id) REFERENCES tweets(id)
-        )
-        """)
+        with self._lock:
+            cursor = self._conn.cursor()
 
-        conn.commit()
-        conn.close()
+            # Create tweets table
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS tweets (
+                id TEXT PRIMARY KEY,
+                content TEXT NOT NULL,
+                type TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                metadata TEXT
+            )
+            """)
+
+            # Create engagement metrics table
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS engagement_metrics (
+                tweet_id TEXT,
+                likes INTEGER,
+                retweets INTEGER,
+                replies INTEGER,
+                impressions INTEGER,
+                collected_at TEXT NOT NULL,
+                FOREIGN KEY (tweet_id) REFERENCES tweets(id)
+            )
+            """)
+
+            # Compressed tweet metadata; the legacy JSON column is kept for rows written before it existed
+            tweet_columns = {row['name'] for row in cursor.execute("PRAGMA table_info(tweets)")}
+            if 'metadata_gz' not in tweet_columns:
+                cursor.execute("ALTER TABLE tweets ADD COLUMN metadata_gz BLOB")
+
+            # Engagement score as a generated column (SQLite can only add VIRTUAL ones to an existing table)
+            columns = {row['name'] for row in cursor.execute("PRAGMA table_xinfo(engagement_metrics)")}
+            if 'score' not in columns:
+                cursor.execute("""
+                ALTER TABLE engagement_metrics
+                ADD COLUMN score INTEGER GENERATED ALWAYS AS (likes + retweets * 2 + replies * 3) VIRTUAL
+                """)
+
+            # Indexes for per-tweet metric lookups, score ranking and time-range queries
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_em_tweet_id ON engagement_metrics(tweet_id, collected_at)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_em_collected ON engagement_metrics(collected_at)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_em_score ON engagement_metrics(score DESC)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_tweets_created ON tweets(created_at)")
 
     def store_tweet(self, tweet_data: Dict, tweet_type: str = "regular"):
         """
@@ -54,22 +133,38 @@ class EngagementTracker:
             tweet_data (Dict): Tweet metadata including id, content, and creation time
             tweet_type (str): Type of tweet (regular, thread, response, etc.)
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._lock:
+            self._conn.execute("""
+            INSERT INTO tweets (id, content, type, created_at, metadata_gz)
+            VALUES (?, ?, ?, ?, ?)
+            """, (
+                tweet_data['id'],
+                tweet_data['text'],
+                tweet_type,
+                tweet_data['created_at'],
+                zlib.compress(json.dumps(tweet_data).encode(), 6)
+            ))
 
-        cursor.execute("""
-        INSERT INTO tweets (id, content, type, created_at, metadata)
-        VALUES (?, ?, ?, ?, ?)
-        """, (
-            tweet_data['id'],
-            tweet_data['text'],
-            tweet_type,
-            tweet_data['created_at'],
-            json.dumps(tweet_data)
-        ))
+    def get_tweet_metadata(self, tweet_id: str) -> Optional[Dict]:
+        """
+        Get the stored metadata for a tweet.
+        
+        Args:
+            tweet_id (str): The ID of the tweet
+            
+        Returns:
+            Optional[Dict]: The tweet metadata, or None if the tweet is unknown
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT metadata, metadata_gz FROM tweets WHERE id = ?", (tweet_id,)
+            ).fetchone()
 
-        conn.commit()
-        conn.close()
+        if row is None:
+            return None
+        if row['metadata_gz'] is not None:
+            return json.loads(zlib.decompress(row['metadata_gz']))
+        return json.loads(row['metadata']) if row['metadata'] else None
 
     def store_metrics(self, tweet_id: str, metrics: Dict):
         """
@@ -79,28 +174,33 @@ class EngagementTracker:
             tweet_id (str): The ID of the tweet
             metrics (Dict): Engagement metrics data
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._lock:
+            self._conn.execute(self._SQL_INSERT_METRICS, (
+                tweet_id,
+                metrics['likes'],
+                metrics['retweets'],
+                metrics['replies'],
+                metrics['impressions'],
+                metrics['collected_at']
+            ))
 
-        cursor.execute("""
-        INSERT INTO engagement_metrics 
-        (tweet_id, likes, retweets, replies, impressions, collected_at)
-        VALUES (?, ?, ?, ?, ?, ?)
-        """, (
-            tweet_id,
-            metrics['likes'],
-            metrics['retweets'],
-            metrics['replies'],
-            metrics['impressions'],
-            metrics['collected_at']
-        ))
-
-        conn.commit()
-        conn.close()
+    def store_metrics_bulk(self, rows: List[Tuple]):
+        """
+        Store engagement metrics for many tweets in a single transaction.
+        
+        Args:
+            rows (List[Tuple]): (tweet_id, likes, retweets, replies, impressions, collected_at) tuples
+        """
+        if not rows:
+            return
+
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(self._SQL_INSERT_METRICS, rows)
 
     def get_best_performing_tweets(self, limit: int = 5) -> List[Dict]:
         """
-        Get the best performing tweets based on engagement metrics.
+        Get the best performing tweets based on their latest engagement metrics.
         
         Args:
             limit (int): Number of tweets to return
@@ -108,42 +208,40 @@ class EngagementTracker:
         Returns:
             List[Dict]: List of tweet data with their metrics
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-        SELECT 
-            t.id,
-            t.content,
-            t.type,
-            t.created_at,
-            MAX(m.likes) as likes,
-            MAX(m.retweets) as retweets,
-            MAX(m.replies) as replies,
-            MAX(m.impressions) as impressions
-        FROM tweets t
-        JOIN engagement_metrics m ON t.id = m.tweet_id
-        GROUP BY t.id
-        ORDER BY (likes + retweets * 2 + replies * 3) DESC
-        LIMIT ?
-        """, (limit,))
-
-        results = cursor.fetchall()
-        conn.close()
+        with self._lock:
+            results = self._conn.execute(self._SQL_BEST_PERFORMING, (limit,)).fetchall()
 
         return [{
-            'id': row[0],
-            'content': row[1],
-            'type': row[2],
-            'created_at': row[3],
+            'id': row['id'],
+            'content': row['content'],
+            'type': row['type'],
+            'created_at': row['created_at'],
             'metrics': {
-                'likes': row[4],
-                'retweets': row[5],
-                'replies': row[6],
-                'impressions': row[7]
+                'likes': row['likes'],
+                'retweets': row['retweets'],
+                'replies': row['replies'],
+                'impressions': row['impressions']
             }
         } for row in results]
 
+    def get_recent_tweet_ids(self, limit: int = 50, since_hours: int = 48) -> List[str]:
+        """
+        Get the IDs of the most recently posted tweets.
+        
+        Args:
+            limit (int): Maximum number of IDs to return
+            since_hours (int): Only include tweets posted within this many hours
+            
+        Returns:
+            List[str]: Tweet IDs, newest first
+        """
+        with self._lock:
+            # created_at holds local-time isoformat() strings, so compare against local time too
+            cutoff = (datetime.now() - timedelta(hours=since_hours)).isoformat()
+            results = self._conn.execute(self._SQL_RECENT_TWEET_IDS, (cutoff, limit)).fetchall()
+
+        return [row['id'] for row in results]
+
     def get_performance_stats(self, days: int = 30) -> Dict:
         """
         Get performance statistics for a specific time period.
@@ -154,30 +252,13 @@ class EngagementTracker:
         Returns:
             Dict: Performance statistics
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._lock:
+            results = self._conn.execute(self._SQL_PERFORMANCE_STATS, (f'-{days} days',)).fetchall()
 
-        cursor.execute("""
-        SELECT 
-            t.type,
-            AVG(m.likes) as avg_likes,
-            AVG(m.retweets) as avg_retweets,
-            AVG(m.replies) as avg_replies,
-            AVG(m.impressions) as avg_impressions,
-            COUNT(*) as total_posts
-        FROM tweets t
-        JOIN engagement_metrics m ON t.id = m.tweet_id
-        WHERE datetime(t.created_at) >= datetime('now', ?)
-        GROUP BY t.type
-        """, (f'-{days} days',))
-
-        results = cursor.fetchall()
-        conn.close()
-
-        return {row[0]: {
-            'avg_likes': row[1],
-            'avg_retweets': row[2],
-            'avg_replies': row[3],
-            'avg_impressions': row[4],
-            'total_posts': row[5]
-        } for row in results} 
\ No newline at end of file
+        return {row['type']: {
+            'avg_likes': row['avg_likes'],
+            'avg_retweets': row['avg_retweets'],
+            'avg_replies': row['avg_replies'],
+            'avg_impressions': row['avg_impressions'],
+            'total_posts': row['total_posts']
+        } for row in results}
\ No newline at end of file
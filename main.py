@@ -1,29 +1,16 @@
 import os
 from dotenv import load_dotenv
+from config import configure_logging, missing_env
 from scheduler import MarketingScheduler
-import signal
 import sys
 
-def signal_handler(sig, frame):
-    """Handle graceful shutdown on CTRL+C"""
-    print('\nShutting down gracefully...')
-    sys.exit(0)
-
 def main():
     # Load environment variables
     load_dotenv()
+    configure_logging(os.getenv('LOG_LEVEL', 'INFO'))
     
     # Verify required environment variables
-    required_vars = [
-        'OPENAI_API_KEY',
-        'TWITTER_API_KEY',
-        'TWITTER_API_SECRET',
-        'TWITTER_ACCESS_TOKEN',
-        'TWITTER_ACCESS_TOKEN_SECRET',
-        'TWITTER_BEARER_TOKEN'
-    ]
-    
-    missing_vars = [var for var in required_vars if not os.getenv(var)]
+    missing_vars = missing_env()
     if missing_vars:
         print("Error: Missing required environment variables:")
         for var in missing_vars:
@@ -36,16 +23,10 @@ def main():
     # Initialize and run the scheduler
     scheduler = MarketingScheduler()
     
-    # Register signal handler for graceful shutdown
-    signal.signal(signal.SIGINT, signal_handler)
-    
     try:
-        scheduler.run()
+        # Runs the event loop until CTRL+C; shutdown signals are handled by the scheduler
         print("AI Marketing Bot is running. Press CTRL+C to exit.")
-        
-        # Keep the main thread alive
-        while True:
-            signal.pause()
+        scheduler.run()
     except Exception as e:
         print(f"Error: {str(e)}")
         sys.exit(1)
@@ -0,0 +1,123 @@
+import os
+import sqlite3
+import hashlib
+import pickle
+import threading
+import time
+from typing import Any, Optional
+
+class CacheMissError(Exception):
+    """Raised in replay mode when a response is not in the cache."""
+
+class ResponseCache:
+    """
+    On-disk cache of Twitter API responses keyed by a SHA-256 hash of the request.
+
+    Modes:
+        enabled:  read from the cache first and store fresh responses
+        readonly: read from the cache but never write to it
+        replay:   serve only from the cache, raising CacheMissError on a miss
+        disabled: bypass the cache entirely
+
+    A separate state table persists small values, such as polling cursors, in every mode.
+    """
+
+    MODES = ('enabled', 'readonly', 'replay', 'disabled')
+
+    def __init__(self, mode: str = 'enabled', db_path: str = "data/twitter_cache.db"):
+        """
+        Initialize the response cache.
+
+        Args:
+            mode (str): One of MODES
+            db_path (str): Path to the SQLite database file
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Invalid cache mode '{mode}', expected one of {', '.join(self.MODES)}")
+
+        self.mode = mode
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the database on first use, so a disabled cache never touches disk. Call with the lock held."""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                response BLOB NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """)
+            self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS state (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+            """)
+        return self._conn
+
+    @staticmethod
+    def key(*parts) -> str:
+        """Build a cache key from the request's identifying parts, e.g. key('get_tweet', tweet_id)."""
+        return hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()
+
+    @property
+    def readable(self) -> bool:
+        return self.mode != 'disabled'
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[Any]:
+        """
+        Look up a cached response.
+
+        Args:
+            key (str): Cache key from key()
+            max_age (Optional[float]): Ignore entries older than this many seconds; replay mode
+                serves recorded responses regardless of age
+
+        Raises:
+            CacheMissError: If the key is missing in replay mode
+        """
+        if not self.readable:
+            return None
+
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT response, created_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+
+        if row is None:
+            if self.mode == 'replay':
+                raise CacheMissError(f"No cached response for key {key}")
+            return None
+        if max_age is not None and self.mode != 'replay' and time.time() - row[1] > max_age:
+            return None
+        return pickle.loads(row[0])
+
+    def put(self, key: str, response: Any):
+        """Store a response; a no-op unless the cache is enabled."""
+        if self.mode != 'enabled':
+            return
+
+        with self._lock:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO cache (key, response, created_at) VALUES (?, ?, ?)",
+                (key, pickle.dumps(response), time.time())
+            )
+
+    def get_state(self, key: str) -> Optional[str]:
+        """Read a persisted state value (e.g. a polling cursor); available in every mode."""
+        with self._lock:
+            row = self._connection().execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_state(self, key: str, value: str):
+        """Persist a state value; available in every mode."""
+        with self._lock:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, value)
+            )
@@ -1,21 +1,28 @@
 import os
+import asyncio
+import inspect
+import itertools
+import signal
 import schedule
-import time
 from datetime import datetime
-from typing import Dict, List, Optional
-import threading
+from typing import Callable, Dict, List, Set, Tuple
 
+from batch_generator import BatchGenerator
 from content_generator import ContentGenerator
-from twitter_api import TwitterAPI
+from twitter_api import MAX_TWEET_WEIGHT, TwitterAPI, weighted_len
 from engagement_tracker import EngagementTracker
 
 class MarketingScheduler:
     def __init__(self):
         """Initialize the marketing scheduler with necessary components."""
         self.content_generator = ContentGenerator()
-        self.twitter_api = TwitterAPI()
+        self.batch_generator = BatchGenerator(self.content_generator)
+        self.twitter_api = TwitterAPI.from_env()
         self.engagement_tracker = EngagementTracker()
         
+        # Jobs currently running on the event loop, kept referenced until they finish
+        self._tasks: Set[asyncio.Task] = set()
+        
         # Parse posting times from environment variable
         self.posting_times = os.getenv('POSTING_TIMES', '09:00,15:00').split(',')
         
@@ -58,115 +65,213 @@ class MarketingScheduler:
             ]
         }
         
-        # Initialize category rotation
+        # Precompute the rotation, interleaving categories so consecutive threads cover different ones
         self.categories = list(self.ai_focus_areas.keys())
-        self.current_category_index = 0
-        self.topic_indices = {category: 0 for category in self.categories}
+        rounds = max(len(topics) for topics in self.ai_focus_areas.values())
+        self._rotation = itertools.cycle([
+            (category, self.ai_focus_areas[category][i % len(self.ai_focus_areas[category])])
+            for i in range(rounds)
+            for category in self.categories
+        ])
 
-    def get_next_focus_area(self) -> str:
-        """Get the next focus area using category rotation."""
-        # Get current category
-        current_category = self.categories[self.current_category_index]
-        
-        # Get next topic from current category
-        topics = self.ai_focus_areas[current_category]
-        current_topic_index = self.topic_indices[current_category]
-        focus_area = topics[current_topic_index]
-        
-        # Update indices
-        self.topic_indices[current_category] = (current_topic_index + 1) % len(topics)
-        self.current_category_index = (self.current_category_index + 1) % len(self.categories)
+    def get_next_focus_area(self) -> Tuple[str, str]:
+        """Get the next (category, focus_area) pair in the rotation."""
+        return next(self._rotation)
+
+    def peek_focus_areas(self, count: int) -> List[str]:
+        """Return the next focus areas in rotation without advancing it."""
+        self._rotation, upcoming = itertools.tee(self._rotation)
+        return [focus_area for _, focus_area in itertools.islice(upcoming, count)]
+
+    def _spawn(self, job: Callable):
+        """
+        Start a scheduled job on the running event loop without blocking it.
         
-        return focus_area
+        Coroutine functions run as tasks; blocking functions run in a worker thread.
+        """
+        coro = job() if inspect.iscoroutinefunction(job) else asyncio.to_thread(job)
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
 
     def schedule_daily_posts(self):
         """Schedule all daily posting jobs."""
         # Morning expert thread
-        schedule.every().day.at("09:00").do(self.post_morning_expert_thread)
+        schedule.every().day.at("09:00").do(self._spawn, self.post_morning_expert_thread)
         
         # Afternoon expert thread
-        schedule.every().day.at("15:00").do(self.post_afternoon_expert_thread)
+        schedule.every().day.at("15:00").do(self._spawn, self.post_afternoon_expert_thread)
         
         # Schedule metrics collection every 2 hours
-        schedule.every(2).hours.do(self.collect_metrics)
+        schedule.every(2).hours.do(self._spawn, self.acollect_metrics)
+        
+        # Pre-generate the day's threads through the Batch API and poll for results
+        schedule.every().day.at("03:00").do(self._spawn, self.pregenerate_expert_threads)
+        schedule.every(15).minutes.do(self._spawn, self.poll_batches)
 
-    def post_morning_expert_thread(self):
-        """Post a morning expert thread about AI technology."""
+    def pregenerate_expert_threads(self):
+        """Submit the next day's expert threads (morning and afternoon) as a batch job."""
         try:
-            focus_area = self.get_next_focus_area()
-            print(f"\nGenerating morning expert thread about: {focus_area}")
+            self.batch_generator.submit(self.peek_focus_areas(2))
+        except Exception as e:
+            print(f"Error submitting expert thread batch: {str(e)}")
+
+    def poll_batches(self):
+        """Cache the results of any completed batch jobs."""
+        try:
+            self.batch_generator.poll()
+        except Exception as e:
+            print(f"Error polling expert thread batches: {str(e)}")
+
+    async def _post_pipelined_thread(self, focus_area: str, category: str, header: str, tweet_type: str) -> List[Dict]:
+        """
+        Generate and post an expert thread as a pipeline.
+        
+        A producer streams tweets from the content generator into a queue while the consumer
+        posts each one as a reply to the previous tweet, so posting overlaps generation.
+        
+        Args:
+            focus_area (str): Focus area of the thread
+            category (str): Category of the focus area
+            header (str): Text prepended to the first tweet
+            tweet_type (str): Type recorded for each stored tweet
             
-            tweets = self.content_generator.generate_ai_expert_thread(focus_area)
+        Returns:
+            List[Dict]: Metadata of the posted tweets
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        
+        def produce():
+            try:
+                for tweet in self.content_generator.igenerate_ai_expert_thread(focus_area, category):
+                    loop.call_soon_threadsafe(queue.put_nowait, tweet)
+            finally:
+                # Sentinel marking the end of the thread
+                loop.call_soon_threadsafe(queue.put_nowait, None)
+        
+        producer = asyncio.create_task(asyncio.to_thread(produce))
+        thread_data = []
+        previous_tweet_id = None
+        index = 0
+        
+        try:
+            while (tweet := await queue.get()) is not None:
+                index += 1
+                if index == 1:
+                    tweet = f"{header}\n{tweet}"
             
-            # Add category context to first tweet
-            category = self.categories[(self.current_category_index - 1) % len(self.categories)]
-            tweets[0] = f"🎯 {category} Insights:\n{tweets[0]}"
+                if weighted_len(tweet) > MAX_TWEET_WEIGHT:
+                    print(f"Skipping tweet {index} - exceeds {MAX_TWEET_WEIGHT} weighted characters: {weighted_len(tweet)}")
+                    continue
             
-            thread_data = self.twitter_api.post_thread(tweets)
+                tweet_data = await self.twitter_api.post_tweet(tweet, in_reply_to_tweet_id=previous_tweet_id)
+                if not tweet_data:
+                    break
+            
+                await asyncio.to_thread(self.engagement_tracker.store_tweet, tweet_data, tweet_type)
+                thread_data.append(tweet_data)
+                previous_tweet_id = tweet_data['id']
+        finally:
+            # Await the producer even if posting raised, so its thread is never left unobserved;
+            # this also surfaces generation errors, and generation still finishes (and is cached) if posting stopped early
+            await producer
+        return thread_data
+
+    async def post_morning_expert_thread(self):
+        """Post a morning expert thread about AI technology."""
+        try:
+            category, focus_area = self.get_next_focus_area()
+            print(f"\nGenerating morning expert thread about: {focus_area}")
+            
+            thread_data = await self._post_pipelined_thread(
+                focus_area,
+                category,
+                f"🎯 {category} Insights:",
+                f"expert_thread_morning_{category.lower()}"
+            )
             
             if thread_data:
-                for tweet_data in thread_data:
-                    self.engagement_tracker.store_tweet(tweet_data, f"expert_thread_morning_{category.lower()}")
                 print(f"Posted morning expert thread ({category}) with {len(thread_data)} tweets")
                 
         except Exception as e:
             print(f"Error in morning expert thread: {str(e)}")
 
-    def post_afternoon_expert_thread(self):
+    async def post_afternoon_expert_thread(self):
         """Post an afternoon expert thread about AI technology."""
         try:
-            focus_area = self.get_next_focus_area()
+            category, focus_area = self.get_next_focus_area()
             print(f"\nGenerating afternoon expert thread about: {focus_area}")
             
-            tweets = self.content_generator.generate_ai_expert_thread(focus_area)
-            
-            # Add category context to first tweet
-            category = self.categories[(self.current_category_index - 1) % len(self.categories)]
-            tweets[0] = f"💡 {category} Deep Dive:\n{tweets[0]}"
-            
-            thread_data = self.twitter_api.post_thread(tweets)
+            thread_data = await self._post_pipelined_thread(
+                focus_area,
+                category,
+                f"💡 {category} Deep Dive:",
+                f"expert_thread_afternoon_{category.lower()}"
+            )
             
             if thread_data:
-                for tweet_data in thread_data:
-                    self.engagement_tracker.store_tweet(tweet_data, f"expert_thread_afternoon_{category.lower()}")
                 print(f"Posted afternoon expert thread ({category}) with {len(thread_data)} tweets")
                 
         except Exception as e:
             print(f"Error in afternoon expert thread: {str(e)}")
 
-    def collect_metrics(self):
+    async def acollect_metrics(self):
         """Collect and store engagement metrics for recent tweets."""
         try:
-            # Get recent tweets from database
-            recent_tweets = self.engagement_tracker.get_best_performing_tweets(limit=50)
+            # Get recent tweet IDs from database
+            tweet_ids = self.engagement_tracker.get_recent_tweet_ids(limit=50)
             
-            for tweet in recent_tweets:
-                metrics = self.twitter_api.get_tweet_metrics(tweet['id'])
-                if metrics:
-                    self.engagement_tracker.store_metrics(tweet['id'], metrics)
+            # One lookup request per 100 tweets instead of one per tweet
+            metrics_by_id = await self.twitter_api.get_tweet_metrics_bulk(tweet_ids)
             
-            print(f"Collected metrics for {len(recent_tweets)} tweets")
+            rows = [(
+                tweet_id,
+                metrics['likes'],
+                metrics['retweets'],
+                metrics['replies'],
+                metrics.get('impressions'),
+                metrics['collected_at']
+            ) for tweet_id, metrics in metrics_by_id.items()]
+            
+            # Store all rows in one transaction instead of one commit per tweet
+            self.engagement_tracker.store_metrics_bulk(rows)
+            
+            print(f"Collected metrics for {len(tweet_ids)} tweets")
         except Exception as e:
             print(f"Error collecting metrics: {str(e)}")
 
-    def run(self):
-        """Run the scheduler in a separate thread."""
+    async def arun(self):
+        """Run scheduled jobs on the event loop, sleeping until the next one is due."""
         self.schedule_daily_posts()
         
-        def run_scheduler():
-            while True:
-                schedule.run_pending()
-                time.sleep(60)
-        
-        scheduler_thread = threading.Thread(target=run_scheduler)
-        scheduler_thread.daemon = True
-        scheduler_thread.start()
+        # Stop on SIGINT/SIGTERM from within the loop (not supported on Windows, where
+        # CTRL+C raises KeyboardInterrupt instead)
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except NotImplementedError:
+                pass
         
         print("Marketing scheduler is running...")
         
-        # Keep the main thread alive
+        while not stop.is_set():
+            schedule.run_pending()
+            
+            # Sleep until the next job is due, waking early on shutdown
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=max(schedule.idle_seconds(), 0))
+            except asyncio.TimeoutError:
+                pass
+        
+        await self.twitter_api.close()
+        print("\nShutting down gracefully...")
+
+    def run(self):
+        """Run the scheduler on an asyncio event loop until interrupted."""
         try:
-            while True:
-                time.sleep(1)
+            asyncio.run(self.arun())
         except KeyboardInterrupt:
-            print("\nShutting down gracefully...") 
\ No newline at end of file
+            print("\nShutting down gracefully...")
@@ -1,20 +1,12 @@
-import os
+import asyncio
 from dotenv import load_dotenv
+from config import REQUIRED_ENV, configure_logging, missing_env
 from content_generator import ContentGenerator
 from twitter_api import TwitterAPI
 
 def verify_environment():
     """Verify all required environment variables are present."""
-    required_vars = [
-        'OPENAI_API_KEY',
-        'TWITTER_API_KEY',
-        'TWITTER_API_SECRET',
-        'TWITTER_ACCESS_TOKEN',
-        'TWITTER_ACCESS_TOKEN_SECRET',
-        'TWITTER_BEARER_TOKEN'
-    ]
-    
-    missing = [var for var in required_vars if not os.getenv(var)]
+    missing = missing_env()
     
     if missing:
         print("\nMissing required environment variables:")
@@ -23,16 +15,24 @@ def verify_environment():
         return False
         
     print("\nEnvironment variables check:")
-    for var in required_vars:
+    for var in sorted(REQUIRED_ENV):
         print(f"✓ {var} is set")
     return True
 
+async def post_and_close(twitter_api: TwitterAPI, content: str):
+    """Post a tweet and release the client's HTTP session."""
+    try:
+        return await twitter_api.post_tweet(content)
+    finally:
+        await twitter_api.close()
+
 def test_single_post():
     """Test posting a single tweet about AI technology."""
     print("\nInitializing test...")
     
     # Load environment variables
     load_dotenv()
+    configure_logging()
     
     # Verify environment
     if not verify_environment():
@@ -42,7 +42,7 @@ def test_single_post():
     try:
         print("\nInitializing services...")
         content_generator = ContentGenerator()
-        twitter_api = TwitterAPI()
+        twitter_api = TwitterAPI.from_env()
         
         print("\nGenerating tweet content...")
         content = content_generator.generate_tweet(
@@ -59,7 +59,7 @@ def test_single_post():
         print(f"{content}")
         
         print("\nAttempting to post tweet...")
-        tweet_data = twitter_api.post_tweet(content)
+        tweet_data = asyncio.run(post_and_close(twitter_api, content))
         
         if tweet_data:
             print("\n✓ Tweet posted successfully!")
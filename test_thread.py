@@ -1,19 +1,30 @@
 import os
+import asyncio
+from typing import List
 from dotenv import load_dotenv
+from config import configure_logging
 from content_generator import ContentGenerator
 from twitter_api import TwitterAPI
 
+async def post_thread_and_close(twitter_api: TwitterAPI, tweets: List[str]):
+    """Post a thread and release the client's HTTP session."""
+    try:
+        return await twitter_api.post_thread(tweets)
+    finally:
+        await twitter_api.close()
+
 def test_claude_thread():
     """Test posting a thread about Claude in Cursor (Cluey)."""
     print("\nInitializing Claude/Cursor thread test...")
     
     # Load environment variables
     load_dotenv()
+    configure_logging()
     
     try:
         print("\nInitializing services...")
         content_generator = ContentGenerator()
-        twitter_api = TwitterAPI()
+        twitter_api = TwitterAPI.from_env()
         
         print("\nGenerating expert thread about Claude in Cursor...")
         
@@ -36,7 +47,7 @@ def test_claude_thread():
             print(f"{tweet}")
         
         print("\nAttempting to post thread...")
-        thread_data = twitter_api.post_thread(thread_content)
+        thread_data = asyncio.run(post_thread_and_close(twitter_api, thread_content))
         
         if thread_data:
             print("\n✓ Thread posted successfully!")
@@ -0,0 +1,212 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+
+import aiohttp
+import requests
+import tweepy
+
+from response_cache import ResponseCache
+from twitter_api import TwitterAPI, _is_retryable, weighted_len
+
+class FakeResponse:
+    reason = 'error'
+    headers = {}
+
+    def __init__(self, status):
+        self.status = status
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.db_path = os.path.join(tempfile.mkdtemp(), 'cache.db')
+        writer = ResponseCache('enabled', self.db_path)
+        writer.put('fresh', {'likes': 1})
+        writer.put('stale', {'likes': 2})
+        writer._connection().execute("UPDATE cache SET created_at = ? WHERE key = 'stale'", (time.time() - 120,))
+
+    def test_max_age_skips_stale_entries(self):
+        cache = ResponseCache('enabled', self.db_path)
+        self.assertEqual(cache.get('fresh', max_age=60), {'likes': 1})
+        self.assertIsNone(cache.get('stale', max_age=60))
+        self.assertEqual(cache.get('stale'), {'likes': 2})
+
+    def test_replay_serves_stale_entries(self):
+        cache = ResponseCache('replay', self.db_path)
+        self.assertEqual(cache.get('stale', max_age=60), {'likes': 2})
+
+class TrendsReplayTest(unittest.IsolatedAsyncioTestCase):
+    async def test_replay_serves_trends_recorded_long_ago(self):
+        db_path = os.path.join(tempfile.mkdtemp(), 'cache.db')
+        recorder = ResponseCache('enabled', db_path)
+        recorder.put(ResponseCache.key('get_trends', 1), ['#AI'])
+        recorder._connection().execute("UPDATE cache SET created_at = ?", (time.time() - 3600,))
+
+        api = TwitterAPI('key', 'secret', 'token', 'token-secret', 'bearer', cache_mode='replay')
+        api._response_cache = ResponseCache('replay', db_path)
+        try:
+            self.assertEqual(await api.get_trending_topics(1), ['#AI'])
+        finally:
+            await api.close()
+
+class RetryableErrorTest(unittest.TestCase):
+    def test_wrapped_requests_connection_error_is_retried(self):
+        # tweepy.API raises TweepyException from inside its except block around session.request
+        try:
+            try:
+                raise requests.exceptions.ConnectionError("connection reset")
+            except Exception as e:
+                raise tweepy.TweepyException(f"Failed to send request: {e}")
+        except tweepy.TweepyException as wrapped:
+            self.assertTrue(_is_retryable(wrapped))
+
+        self.assertTrue(_is_retryable(requests.exceptions.ConnectionError()))
+        self.assertFalse(_is_retryable(tweepy.TweepyException("bad payload")))
+
+class WriteRetryTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.api = TwitterAPI('key', 'secret', 'token', 'token-secret', 'bearer',
+                              retry_delay=0, cache_mode='disabled')
+        self.api._ensure_session = lambda: None
+        self.attempts = 0
+
+    async def asyncTearDown(self):
+        await self.api.close()
+
+    def create_tweet_failing_with(self, error):
+        async def create_tweet(text, in_reply_to_tweet_id=None):
+            self.attempts += 1
+            if self.attempts == 1:
+                raise error
+            return {'data': {'id': '1'}}
+        self.api.client.create_tweet = create_tweet
+
+    async def test_disconnect_after_send_is_not_retried(self):
+        self.create_tweet_failing_with(aiohttp.ServerDisconnectedError())
+
+        self.assertIsNone(await self.api.post_tweet('hello'))
+        self.assertEqual(self.attempts, 1)
+
+    async def test_rate_limit_waits_until_reset(self):
+        self.create_tweet_failing_with(
+            tweepy.TooManyRequests(FakeResponse(429), response_json={}, reset_time=time.time() + 0.5)
+        )
+
+        started = time.monotonic()
+        self.assertEqual((await self.api.post_tweet('hello'))['id'], '1')
+        self.assertGreaterEqual(time.monotonic() - started, 0.4)
+        self.assertEqual(self.attempts, 2)
+
+    async def test_connection_never_made_is_retried(self):
+        self.create_tweet_failing_with(aiohttp.ClientConnectorError(None, OSError('refused')))
+
+        self.assertEqual((await self.api.post_tweet('hello'))['id'], '1')
+        self.assertEqual(self.attempts, 2)
+
+class WeightedLenTest(unittest.TestCase):
+    def test_light_and_heavy_characters(self):
+        self.assertEqual(weighted_len('hello'), 5)
+        self.assertEqual(weighted_len('日本'), 4)
+
+    def test_emoji_sequences_weigh_two(self):
+        for emoji in ['😀', '❤\ufe0f', '👍🏽', '👨\u200d👩\u200d👧\u200d👦', '🇺🇸', '1\ufe0f\u20e3']:
+            self.assertEqual(weighted_len(emoji), 2, emoji)
+        self.assertEqual(weighted_len('hi 👍🏽'), 5)
+
+class MetricsSingleFlightTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.api = TwitterAPI('key', 'secret', 'token', 'token-secret', 'bearer', cache_mode='disabled')
+        self.release = asyncio.Event()
+        self.requested = []
+
+        async def fetch_chunk(tweet_ids):
+            self.requested.append(list(tweet_ids))
+            await self.release.wait()
+            return {tweet_id: {'likes': 1, 'collected_at': 'now'} for tweet_id in tweet_ids}
+
+        self.api._fetch_metrics_chunk = fetch_chunk
+
+    async def asyncTearDown(self):
+        await self.api.close()
+
+    async def test_concurrent_callers_share_one_request(self):
+        self.release.set()
+        results = await asyncio.gather(
+            self.api.get_tweet_metrics('x'),
+            self.api.get_tweet_metrics('x'),
+            self.api.get_tweet_metrics_bulk(['x', 'y'])
+        )
+
+        self.assertEqual(self.requested, [['x'], ['y']])
+        self.assertTrue(all(results))
+        self.assertEqual(self.api._inflight, {})
+
+    async def test_cancelled_joined_caller_does_not_break_the_lookup(self):
+        owner = asyncio.create_task(self.api.get_tweet_metrics_bulk(['x', 'y']))
+        await asyncio.sleep(0)
+        joined = asyncio.create_task(self.api.get_tweet_metrics('x'))
+        await asyncio.sleep(0)
+
+        joined.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await joined
+
+        self.release.set()
+        self.assertEqual(set(await owner), {'x', 'y'})
+        self.assertEqual(self.api._inflight, {})
+
+        # Once the TTL entries expire, later lookups fetch again instead of waiting forever
+        self.api._metrics_cache.clear()
+        self.assertIsNotNone(await asyncio.wait_for(self.api.get_tweet_metrics('y'), timeout=2))
+
+class BulkThreadTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.api = TwitterAPI('key', 'secret', 'token', 'token-secret', 'bearer', cache_mode='disabled',
+                              bulk_thread_create=True)
+        self.api._ensure_session = lambda: None
+        self.bulk_calls = 0
+        self.replies = []
+
+        self.api.client.create_tweet = self.create_tweet
+
+    async def create_tweet(self, text, in_reply_to_tweet_id=None):
+        self.replies.append(text)
+        return {'data': {'id': str(len(self.replies))}}
+
+    async def asyncTearDown(self):
+        await self.api.close()
+
+    def fail_bulk_with(self, error):
+        async def request(*args, **kwargs):
+            self.bulk_calls += 1
+            raise error
+        self.api.client.request = request
+
+    async def test_endpoint_is_not_tried_by_default(self):
+        await self.api.close()
+        self.api = TwitterAPI('key', 'secret', 'token', 'token-secret', 'bearer', cache_mode='disabled')
+        self.api._ensure_session = lambda: None
+        self.api.client.create_tweet = self.create_tweet
+        self.fail_bulk_with(tweepy.TwitterServerError(FakeResponse(503), response_json={}))
+
+        self.assertEqual(len(await self.api.post_thread(['a', 'b'])), 2)
+        self.assertEqual(self.bulk_calls, 0)
+        self.assertEqual(self.replies, ['a', 'b'])
+
+    async def test_forbidden_disables_endpoint_and_falls_back(self):
+        self.fail_bulk_with(tweepy.Forbidden(FakeResponse(403), response_json={}))
+
+        self.assertEqual(len(await self.api.post_thread(['a', 'b'])), 2)
+        self.assertEqual(len(await self.api.post_thread(['c'])), 1)
+        self.assertEqual(self.bulk_calls, 1)
+        self.assertEqual(self.replies, ['a', 'b', 'c'])
+
+    async def test_server_error_does_not_repost_as_reply_chain(self):
+        self.fail_bulk_with(tweepy.TwitterServerError(FakeResponse(503), response_json={}))
+
+        self.assertEqual(await self.api.post_thread(['a', 'b']), [])
+        self.assertEqual(self.replies, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,217 +1,660 @@
 import os
-import tweepy
+import re
+import random
 import time
-from typing import Dict, List, Optional
+import socket
+import logging
+import unicodedata
+import asyncio
+import functools
+import aiohttp
+import httpx
+import requests
+import tweepy
+from cachetools import TTLCache
+from tweepy.asynchronous import AsyncClient
+from tenacity import (AsyncRetrying, RetryCallState, retry_if_exception, stop_after_attempt,
+                      wait_exponential, wait_random)
+from typing import Any, Callable, Dict, List, Literal, Optional
 from datetime import datetime
 
+from response_cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+# Tweets may weigh at most 280; characters outside these ranges (CJK, emoji, ...) weigh 2
+MAX_TWEET_WEIGHT = 280
+_HEAVY_CHARS = re.compile('[^\u0000-\u10FF\u2000-\u200D\u2010-\u201F\u2032-\u2037]')
+
+# A whole emoji sequence weighs 2: flags, keycaps, and pictographs with their variation
+# selectors, skin tone modifiers, tag characters and ZWJ-joined parts
+_EMOJI_PICTOGRAPH = ('[\u203C\u2049\u2122\u2139\u2194-\u21AA\u231A-\u23FF\u24C2\u25AA-\u25FE'
+                     '\u2600-\u27BF\u2934\u2935\u2B05-\u2B55\u3030\u303D\u3297\u3299\U0001F000-\U0001FAFF]'
+                     '|[\u00A9\u00AE]\uFE0F')
+_EMOJI_MODIFIERS = '[\uFE0F\U0001F3FB-\U0001F3FF\U000E0020-\U000E007F]*'
+_EMOJI_SEQUENCES = re.compile(
+    '[\U0001F1E6-\U0001F1FF]{2}'
+    '|[#*0-9]\uFE0F?\u20E3'
+    f'|(?:{_EMOJI_PICTOGRAPH}){_EMOJI_MODIFIERS}(?:\u200D(?:{_EMOJI_PICTOGRAPH}){_EMOJI_MODIFIERS})*'
+)
+
+def weighted_len(text: str) -> int:
+    """
+    Count a tweet's length the way Twitter does: NFC-normalized code points, where Latin and
+    other light ranges weigh 1, other characters 2, and each emoji sequence 2 in total.
+    URLs are counted as written, not as 23 characters.
+    """
+    text = unicodedata.normalize('NFC', text)
+    text, emoji_count = _EMOJI_SEQUENCES.subn('', text)
+    return len(text) + len(_HEAVY_CHARS.findall(text)) + 2 * emoji_count
+
+def _is_retryable(error: BaseException) -> bool:
+    """Rate limits (429), server errors (5xx) and connection errors are worth retrying."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    # tweepy's v1.1 client re-raises transport errors from requests as a plain TweepyException
+    if type(error) is tweepy.TweepyException:
+        error = error.__context__
+    return isinstance(error, (tweepy.TooManyRequests, tweepy.TwitterServerError, aiohttp.ClientConnectionError,
+                              httpx.TransportError, requests.exceptions.ConnectionError))
+
+def _is_retryable_write(error: BaseException) -> bool:
+    """
+    Only retry a write when it certainly created nothing: a rate limit (429) or a connection
+    that was never established. Server errors and dropped connections may follow a successful
+    create, so retrying them could post the same tweet twice.
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code == 429
+    return isinstance(error, (tweepy.TooManyRequests, aiohttp.ClientConnectorError))
+
+def _rate_limit_reset(error: BaseException) -> Optional[float]:
+    """Unix time at which a 429's rate limit resets, if the response said so."""
+    if isinstance(error, tweepy.TooManyRequests):
+        return error.reset_time
+    if isinstance(error, httpx.HTTPStatusError) and error.response.status_code == 429:
+        reset = error.response.headers.get('x-rate-limit-reset')
+        return float(reset) if reset else None
+    return None
+
+def _retry(operation: str, default: Any = None,
+           retryable: Callable[[BaseException], bool] = _is_retryable) -> Callable:
+    """
+    Retry a TwitterAPI coroutine method according to the type of error it raises.
+    
+    Retryable errors are retried up to max_retries times with jittered exponential backoff;
+    a rate limit that reports its reset time is instead waited out until then (plus jitter).
+    Unauthorized (401) is re-raised since retrying cannot fix credentials. Bad requests and
+    anything else are logged and yield `default`.
+    
+    Args:
+        operation (str): Description of the operation, used in log messages
+        default (Any): Value returned when the call fails for good
+        retryable (Callable): Predicate selecting the errors to retry; reads use _is_retryable,
+            writes the stricter _is_retryable_write
+    """
+    def log_retry(retry_state: RetryCallState):
+        logger.warning("%s while %s, retrying in %.1f seconds",
+                       type(retry_state.outcome.exception()).__name__, operation, retry_state.next_action.sleep)
+    
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            # Jitter keeps concurrent callers from retrying in lockstep after a shared 429
+            backoff = wait_exponential(multiplier=self.retry_delay, max=self.MAX_BACKOFF) + wait_random(0, 2)
+            
+            def wait(retry_state: RetryCallState) -> float:
+                reset_time = _rate_limit_reset(retry_state.outcome.exception())
+                if reset_time is not None:
+                    return max(reset_time - time.time(), 0) + random.uniform(0, 2)
+                return backoff(retry_state)
+            
+            try:
+                async for attempt in AsyncRetrying(
+                    retry=retry_if_exception(retryable),
+                    wait=wait,
+                    stop=stop_after_attempt(self.max_retries + 1),
+                    before_sleep=log_retry,
+                    reraise=True
+                ):
+                    with attempt:
+                        return await func(self, *args, **kwargs)
+            
+            except tweepy.Unauthorized:
+                raise
+            
+            except tweepy.BadRequest as e:
+                logger.error("Bad request while %s: %s", operation, e.api_messages)
+            
+            except Exception as e:
+                if isinstance(e, httpx.HTTPStatusError) and e.response.status_code == 401:
+                    raise
+                if retryable(e):
+                    logger.error("Max retries (%d) exceeded for %s: %s", self.max_retries, operation, e)
+                elif isinstance(e, httpx.HTTPStatusError):
+                    logger.error("HTTP %d while %s: %s", e.response.status_code, operation, e.response.text)
+                else:
+                    logger.exception("Error %s", operation)
+            
+            return default
+        return wrapper
+    return decorator
+
+class TokenBucket:
+    """
+    Async token-bucket throttle that spaces requests out under an endpoint's rate limit.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        """
+        Initialize a full bucket.
+        
+        Args:
+            rate (float): Tokens added per second
+            capacity (int): Maximum number of tokens (the allowed burst)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.last_update = time.monotonic()
+        # Created on first use, inside the running loop; before Python 3.10 a lock created
+        # before asyncio.run binds to a different loop and fails once callers contend for it
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def acquire(self):
+        """Take one token, sleeping until one is available."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        
+        async with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_update) * self.rate)
+            self.last_update = now
+            
+            if self.tokens < 1:
+                # Holding the lock while waiting keeps callers in FIFO order
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self.tokens = 1
+                self.last_update = time.monotonic()
+            
+            self.tokens -= 1
+
 class TwitterAPI:
     """
-    A wrapper class for Twitter API operations using both OAuth 1.0a and OAuth 2.0.
+    An asyncio wrapper class for Twitter API operations using both OAuth 1.0a and OAuth 2.0.
     """
     
-    def __init__(self, max_retries: int = 3, retry_delay: int = 5):
+    # Connection pool sizes; idle connections outlive Twitter's 60-second idle close
+    API_HOST = "api.twitter.com"
+    POOL_MAXSIZE = 64
+    POOL_PER_HOST = 32
+    KEEPALIVE_EXPIRY = 90
+    DNS_CACHE_TTL = 300
+    # Metrics are cached briefly; trends only refresh every few minutes on Twitter's side
+    METRICS_CACHE_TTL = 60
+    TRENDS_CACHE_TTL = 300
+    # Twitter API v2 tweet lookups accept at most 100 IDs per request
+    MAX_IDS_PER_LOOKUP = 100
+    API_BASE_URL = f"https://{API_HOST}/2"
+    # Per-15-minute request limits for creating tweets and for app-authenticated reads
+    WRITE_LIMIT = 200
+    READ_LIMIT = 300
+    RATE_WINDOW = 900
+    # Upper bound for a single retry wait, in seconds
+    MAX_BACKOFF = 300
+
+    def __init__(self, consumer_key: str, consumer_secret: str, access_token: str, access_token_secret: str,
+                 bearer_token: str, max_retries: int = 3, retry_delay: int = 5,
+                 cache_mode: Optional[Literal['enabled', 'readonly', 'replay', 'disabled']] = None,
+                 bulk_thread_create: bool = False):
         """
         Initialize Twitter API client with both OAuth 1.0a and OAuth 2.0 authentication.
         
         Args:
+            consumer_key (str): OAuth 1.0a API key, used for posting
+            consumer_secret (str): OAuth 1.0a API secret
+            access_token (str): OAuth 1.0a access token
+            access_token_secret (str): OAuth 1.0a access token secret
+            bearer_token (str): OAuth 2.0 bearer token, used for reading
             max_retries (int): Maximum number of retries for rate-limited requests
-            retry_delay (int): Initial delay between retries in seconds (doubles with each retry)
+            retry_delay (int): Initial delay between retries in seconds (doubles with each retry, plus jitter)
+            cache_mode (Optional[str]): On-disk response cache mode for reads (see ResponseCache);
+                defaults to the TWITTER_CACHE_MODE environment variable, or 'disabled'
+            bulk_thread_create (bool): Offer threads to the multi-tweet create endpoint before posting
+                them as a reply chain; only enable this for accounts known to have access to it
         """
         try:
-            # Get OAuth 1.0a credentials for posting
-            consumer_key = os.getenv('TWITTER_API_KEY')
-            consumer_secret = os.getenv('TWITTER_API_SECRET')
-            access_token = os.getenv('TWITTER_ACCESS_TOKEN')
-            access_token_secret = os.getenv('TWITTER_ACCESS_TOKEN_SECRET')
-            
-            # Get OAuth 2.0 Bearer Token for reading
-            bearer_token = os.getenv('TWITTER_BEARER_TOKEN')
-            
             if not all([consumer_key, consumer_secret, access_token, access_token_secret]):
                 raise ValueError("Missing OAuth 1.0a credentials - required for posting tweets")
             
             if not bearer_token:
                 raise ValueError("Missing Bearer Token - required for reading tweets")
             
-            print("\nInitializing Twitter client...")
+            logger.debug("Initializing Twitter client")
             
-            # Initialize client with both OAuth 1.0a and OAuth 2.0
-            self.client = tweepy.Client(
+            # Initialize async client with both OAuth 1.0a and OAuth 2.0
+            self.client = AsyncClient(
                 consumer_key=consumer_key,
                 consumer_secret=consumer_secret,
                 access_token=access_token,
                 access_token_secret=access_token_secret,
                 bearer_token=bearer_token,
                 return_type=dict,
-                wait_on_rate_limit=True
+                # Rate limits are handled by _retry, which bounds attempts and adds jitter
+                wait_on_rate_limit=False
+            )
+            
+            # Bearer-token reads go over one multiplexed HTTP/2 connection
+            self._http = httpx.AsyncClient(
+                http2=True,
+                base_url=self.API_BASE_URL,
+                headers={'Authorization': f'Bearer {bearer_token}'},
+                # HTTP/2 multiplexes over one connection; the extra slots only matter on an HTTP/1.1 fallback
+                limits=httpx.Limits(
+                    max_connections=self.POOL_PER_HOST,
+                    max_keepalive_connections=self.POOL_PER_HOST,
+                    keepalive_expiry=self.KEEPALIVE_EXPIRY
+                ),
+                timeout=30.0
             )
             
+            # v1.1 API for trends, built once so its requests.Session keeps connections alive;
+            # retries are handled here rather than inside tweepy
+            self._v1_credentials = (consumer_key, consumer_secret, access_token, access_token_secret)
+            self._v1_api = tweepy.API(tweepy.OAuth1UserHandler(*self._v1_credentials), retry_count=0)
+            self._v1_api.session.mount('https://', requests.adapters.HTTPAdapter(
+                pool_connections=self.POOL_PER_HOST,
+                pool_maxsize=self.POOL_MAXSIZE,
+                max_retries=0
+            ))
+            
+            self._prime_dns()
+            
             self.max_retries = max_retries
             self.retry_delay = retry_delay
-            print("✓ Twitter client initialized successfully")
+            
+            # Short-lived response caches for repeated reads
+            self._metrics_cache = TTLCache(maxsize=4096, ttl=self.METRICS_CACHE_TTL)
+            self._trends_cache = TTLCache(maxsize=16, ttl=self.TRENDS_CACHE_TTL)
+            # Created on first use, inside the running loop (see TokenBucket)
+            self._trends_lock: Optional[asyncio.Lock] = None
+            # Whether to try the multi-tweet create endpoint; opt-in, and cleared after its first 400/403/404
+            self._bulk_create_supported = bulk_thread_create
+            
+            # Metric lookups in progress, shared by concurrent callers asking for the same tweet
+            self._inflight: Dict[str, asyncio.Future] = {}
+            
+            # Persistent response cache for development and replay runs
+            self._response_cache = ResponseCache(cache_mode or os.getenv('TWITTER_CACHE_MODE', 'disabled'))
+            
+            # Newest mention seen per user, so polls only fetch what is new (persisted in the cache's state table)
+            self._since_id: Dict[str, str] = {}
+            
+            # Client-side throttles so requests stay under the limits instead of running into 429s
+            self._write_bucket = TokenBucket(self.WRITE_LIMIT / self.RATE_WINDOW, self.WRITE_LIMIT)
+            self._read_bucket = TokenBucket(self.READ_LIMIT / self.RATE_WINDOW, self.READ_LIMIT)
+            logger.info("Twitter client initialized")
             
         except Exception as e:
-            print(f"\nError initializing Twitter client: {str(e)}")
+            logger.error("Error initializing Twitter client: %s", e)
             raise
 
-    def _handle_rate_limit(self, operation: str, retry_count: int) -> bool:
+    @classmethod
+    def from_env(cls, **kwargs) -> 'TwitterAPI':
         """
-        Handle rate limit with exponential backoff.
+        Create a client from the TWITTER_* environment variables, read and validated once at startup.
         
         Args:
-            operation (str): Description of the operation being performed
-            retry_count (int): Current retry attempt number
-            
-        Returns:
-            bool: True if should retry, False if max retries exceeded
+            **kwargs: Extra arguments passed to the constructor (max_retries, retry_delay, cache_mode,
+                bulk_thread_create)
         """
-        if retry_count >= self.max_retries:
-            print(f"\n❌ Max retries ({self.max_retries}) exceeded for {operation}")
-            return False
-            
-        wait_time = self.retry_delay * (2 ** retry_count)
-        print(f"\n⏳ Rate limit hit for {operation}. Waiting {wait_time} seconds...")
-        
-        # Show a waiting animation
-        for i in range(wait_time):
-            remaining = wait_time - i
-            print(f"\rWaiting... {remaining} seconds remaining {'.' * (i % 4)}", end='', flush=True)
-            time.sleep(1)
-        print("\r", end='', flush=True)  # Clear the last waiting message
+        return cls(
+            consumer_key=os.getenv('TWITTER_API_KEY'),
+            consumer_secret=os.getenv('TWITTER_API_SECRET'),
+            access_token=os.getenv('TWITTER_ACCESS_TOKEN'),
+            access_token_secret=os.getenv('TWITTER_ACCESS_TOKEN_SECRET'),
+            bearer_token=os.getenv('TWITTER_BEARER_TOKEN'),
+            **kwargs
+        )
+
+    def _prime_dns(self):
+        """Resolve the API host once at startup so the first request skips the DNS lookup."""
+        try:
+            socket.getaddrinfo(self.API_HOST, 443, type=socket.SOCK_STREAM)
+        except OSError as e:
+            logger.debug("Could not pre-resolve %s: %s", self.API_HOST, e)
+
+    def _ensure_session(self):
+        """
+        Create the shared aiohttp session on first use.
         
-        return True
+        Without a session tweepy's AsyncClient opens and closes one per request, discarding
+        keep-alive connections. The session must be created inside the running event loop.
+        """
+        if self.client.session is None or self.client.session.closed:
+            self.client.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.POOL_MAXSIZE,
+                    limit_per_host=self.POOL_PER_HOST,
+                    keepalive_timeout=self.KEEPALIVE_EXPIRY,
+                    ttl_dns_cache=self.DNS_CACHE_TTL
+                )
+            )
+
+    async def close(self):
+        """Close the shared HTTP sessions."""
+        if self.client.session is not None and not self.client.session.closed:
+            await self.client.session.close()
+        await self._http.aclose()
 
-    def post_tweet(self, content: str) -> Optional[Dict]:
+    @_retry("posting tweet", retryable=_is_retryable_write)
+    async def _create_tweet(self, text: str, in_reply_to_tweet_id: Optional[str] = None) -> Optional[Dict]:
+        """Create one tweet, returning the response's data (with the new ID) or None."""
+        await self._write_bucket.acquire()
+        response = await self.client.create_tweet(text=text, in_reply_to_tweet_id=in_reply_to_tweet_id)
+        return (response or {}).get('data')
+
+    async def post_tweet(self, content: str, in_reply_to_tweet_id: Optional[str] = None) -> Optional[Dict]:
         """
         Post a tweet using Twitter API v2 with retry logic.
+        
+        Args:
+            content (str): The tweet text
+            in_reply_to_tweet_id (Optional[str]): ID of the tweet to reply to, for threading
         """
-        if not content or len(content) > 280:
-            print(f"Invalid tweet length: {len(content)} characters")
+        if not content or weighted_len(content) > MAX_TWEET_WEIGHT:
+            logger.warning("Invalid tweet length: %d weighted characters", weighted_len(content or ''))
             return None
             
-        retry_count = 0
-        while True:
-            try:
-                print(f"\nPosting tweet ({len(content)} chars)...")
-                response = self.client.create_tweet(text=content)
-                
-                if response and 'data' in response:
-                    tweet_data = response['data']
-                    print(f"✓ Tweet posted successfully (ID: {tweet_data['id']})")
-                    return {
-                        'id': tweet_data['id'],
-                        'text': content,
-                        'created_at': datetime.now().isoformat()
-                    }
-                else:
-                    print("⚠ No response data received")
-                    return None
-                    
-            except tweepy.TooManyRequests:
-                if not self._handle_rate_limit("posting tweet", retry_count):
-                    return None
-                retry_count += 1
-                
-            except Exception as e:
-                print(f"\nError posting tweet: {str(e)}")
-                if hasattr(e, 'response') and e.response is not None:
-                    print(f"Response Status: {e.response.status_code}")
-                    print(f"Response Text: {e.response.text}")
-                return None
+        self._ensure_session()
+        logger.debug("Posting tweet (%d chars)", len(content))
+        tweet_data = await self._create_tweet(content, in_reply_to_tweet_id)
+        if not tweet_data:
+            logger.warning("Tweet was not posted")
+            return None
+        
+        logger.info("Tweet posted (ID: %s)", tweet_data['id'])
+        return {
+            'id': tweet_data['id'],
+            'text': content,
+            'created_at': datetime.now().isoformat()
+        }
+
+    async def post_tweets_bulk(self, contents: List[str]) -> List[Optional[Dict]]:
+        """
+        Post several independent (non-threaded) tweets concurrently.
+        
+        Args:
+            contents (List[str]): Tweet texts
+            
+        Returns:
+            List[Optional[Dict]]: Metadata for each tweet, or None where posting failed
+        """
+        return await asyncio.gather(*(self.post_tweet(content) for content in contents))
 
-    def post_thread(self, tweets: List[str]) -> List[Dict]:
+    async def post_thread(self, tweets: List[str]) -> List[Dict]:
         """
         Post a thread of tweets using Twitter API v2 with retry logic.
+        
+        With bulk_thread_create enabled, the whole thread is first offered to the multi-tweet
+        create endpoint, which posts it in a single request. Otherwise the tweets are posted as
+        a reply chain, in which a tweet that still fails after retries is skipped so the rest of
+        the thread chains onto the last posted tweet.
+        
+        Raises:
+            ValueError: If any tweet is empty or too long; raised before anything is posted
         """
         if not tweets:
             return []
-            
+        
+        # Validate the whole thread once, before any request is made
+        invalid = [index for index, tweet in enumerate(tweets, 1)
+                   if not tweet or weighted_len(tweet) > MAX_TWEET_WEIGHT]
+        if invalid:
+            raise ValueError(f"Tweets {invalid} are empty or exceed {MAX_TWEET_WEIGHT} weighted characters")
+        
+        self._ensure_session()
+        thread_metadata = await self._try_bulk_create(tweets)
+        if thread_metadata is not None:
+            return thread_metadata
+        
+        total = len(tweets)
+        # One timestamp for the whole thread; it is posted within seconds
+        created_at = datetime.now().isoformat()
         thread_metadata = []
         previous_tweet_id = None
 
         for index, tweet in enumerate(tweets, 1):
-            if len(tweet) > 280:
-                print(f"Skipping tweet {index} - exceeds 280 characters: {len(tweet)}")
+            logger.debug("Posting tweet %d/%d", index, total)
+            tweet_data = await self._create_tweet(tweet, previous_tweet_id)
+            if not tweet_data:
+                logger.warning("Thread tweet %d/%d was not posted, skipping it", index, total)
                 continue
-                
-            retry_count = 0
-            while True:
-                try:
-                    print(f"\nPosting tweet {index}/{len(tweets)}...")
-                    
-                    if previous_tweet_id:
-                        response = self.client.create_tweet(
-                            text=tweet,
-                            in_reply_to_tweet_id=previous_tweet_id
-                        )
-                    else:
-                        response = self.client.create_tweet(text=tweet)
-
-                    if response and 'data' in response:
-                        tweet_data = response['data']
-                        metadata = {
-                            'id': tweet_data['id'],
-                            'text': tweet,
-                            'created_at': datetime.now().isoformat()
-                        }
-                        thread_metadata.append(metadata)
-                        previous_tweet_id = tweet_data['id']
-                        print(f"✓ Thread tweet {index}/{len(tweets)} posted")
-                        break  # Success, move to next tweet
-                    
-                except tweepy.TooManyRequests:
-                    if not self._handle_rate_limit(f"posting tweet {index}/{len(tweets)}", retry_count):
-                        return thread_metadata
-                    retry_count += 1
-                    
-                except Exception as e:
-                    print(f"Error in thread at tweet {index}: {str(e)}")
-                    if hasattr(e, 'response') and e.response is not None:
-                        print(f"Response Status: {e.response.status_code}")
-                        print(f"Response Text: {e.response.text}")
-                    return thread_metadata
+            
+            thread_metadata.append({
+                'id': tweet_data['id'],
+                'text': tweet,
+                'created_at': created_at
+            })
+            previous_tweet_id = tweet_data['id']
+            logger.info("Thread tweet %d/%d posted", index, total)
 
         return thread_metadata
 
-    def get_tweet_metrics(self, tweet_id: str) -> Optional[Dict]:
+    async def _try_bulk_create(self, texts: List[str]) -> Optional[List[Dict]]:
+        """
+        Post a whole thread in one request through the multi-tweet create endpoint.
+        
+        The endpoint is not available to every account, so it is only tried when the client was
+        created with bulk_thread_create; the first 400, 403 or 404 disables it for the lifetime
+        of this client. The caller only falls back to a reply chain when the
+        request certainly created nothing; after an ambiguous failure (server error, dropped
+        connection, unreadable response) the thread is not re-posted, to avoid duplicates.
+        
+        Returns:
+            Optional[List[Dict]]: Metadata of the posted tweets (empty if the outcome is unknown),
+            or None if the caller should fall back to posting a reply chain
+        """
+        if not self._bulk_create_supported:
+            return None
+        
+        await self._write_bucket.acquire()
+        try:
+            response = await self.client.request(
+                'POST', '/2/tweets/bulk',
+                params={},
+                json={'tweets': [{'text': text} for text in texts]},
+                user_auth=True
+            )
+            
+        except (tweepy.NotFound, tweepy.Forbidden, tweepy.BadRequest) as e:
+            logger.info("Multi-tweet create endpoint unavailable (%s), posting threads as reply chains", e)
+            self._bulk_create_supported = False
+            return None
+        
+        except (tweepy.Unauthorized, tweepy.TooManyRequests, aiohttp.ClientConnectorError) as e:
+            # Rejected or never sent, so nothing was created
+            logger.warning("Bulk thread post failed (%s), falling back to a reply chain", e)
+            return None
+        
+        except Exception:
+            logger.exception("Bulk thread post failed after it may have been sent; not re-posting it")
+            return []
+        
+        try:
+            tweet_ids = [tweet['id'] for tweet in (await response.json()).get('data', [])]
+        except Exception:
+            logger.exception("Could not read the bulk thread post response; not re-posting it")
+            return []
+        
+        if len(tweet_ids) != len(texts):
+            logger.error("Bulk create returned %d IDs for %d tweets; not re-posting the thread",
+                         len(tweet_ids), len(texts))
+            return []
+        
+        created_at = datetime.now().isoformat()
+        logger.info("Thread of %d tweets posted in one request", len(texts))
+        return [{'id': tweet_id, 'text': text, 'created_at': created_at}
+                for tweet_id, text in zip(tweet_ids, texts)]
+
+    async def get_tweet_metrics(self, tweet_id: str) -> Optional[Dict]:
         """
         Get engagement metrics for a tweet using Twitter API v2 with retry logic.
+        Results are cached for METRICS_CACHE_TTL seconds, and concurrent callers share one request.
+        """
+        return (await self.get_tweet_metrics_bulk([tweet_id])).get(tweet_id)
+
+    async def get_tweet_metrics_bulk(self, tweet_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Get engagement metrics for many tweets, fetching up to 100 per request.
+        Tweets already being fetched by another caller are awaited rather than requested again.
+        
+        Args:
+            tweet_ids (List[str]): IDs of the tweets to fetch metrics for
+            
+        Returns:
+            Dict[str, Dict]: Metrics keyed by tweet ID; tweets that could not be fetched are omitted
+        """
+        results = {}
+        missing = []
+        for tweet_id in dict.fromkeys(tweet_ids):
+            cached = self._metrics_cache.get(tweet_id)
+            if cached is not None:
+                results[tweet_id] = cached
+            else:
+                missing.append(tweet_id)
+        
+        # Fall back to the on-disk cache, skipping entries older than the TTL outside replay
+        # mode; in replay mode a miss raises CacheMissError
+        if missing and self._response_cache.readable:
+            uncached = []
+            for tweet_id in missing:
+                cached = self._response_cache.get(ResponseCache.key('get_tweet', tweet_id),
+                                                  max_age=self.METRICS_CACHE_TTL)
+                if cached is not None:
+                    results[tweet_id] = self._metrics_cache[tweet_id] = cached
+                else:
+                    uncached.append(tweet_id)
+            missing = uncached
+        
+        if not missing:
+            return results
+        
+        # Single-flight: join lookups already in progress and register futures for the rest.
+        # Nothing awaits between the lookup and the registration, so no lock is needed.
+        loop = asyncio.get_running_loop()
+        pending = {}
+        to_fetch = []
+        for tweet_id in missing:
+            future = self._inflight.get(tweet_id)
+            if future is None:
+                future = self._inflight[tweet_id] = loop.create_future()
+                to_fetch.append(tweet_id)
+            pending[tweet_id] = future
+        
+        fetched = {}
+        try:
+            chunks = [to_fetch[i:i + self.MAX_IDS_PER_LOOKUP] for i in range(0, len(to_fetch), self.MAX_IDS_PER_LOOKUP)]
+            for chunk_metrics in await asyncio.gather(*(self._fetch_metrics_chunk(chunk) for chunk in chunks)):
+                fetched.update(chunk_metrics or {})
+        finally:
+            # Always unregister and resolve this caller's futures so joined callers never hang
+            for tweet_id in to_fetch:
+                future = self._inflight.pop(tweet_id)
+                if not future.done():
+                    future.set_result(fetched.get(tweet_id))
+        
+        for tweet_id, future in pending.items():
+            # Shielded, so cancelling a joined caller cannot cancel the shared future
+            metrics = await asyncio.shield(future)
+            if metrics is not None:
+                results[tweet_id] = metrics
+        
+        return results
+
+    @_retry("fetching tweet metrics")
+    async def _fetch_metrics_chunk(self, tweet_ids: List[str]) -> Optional[Dict[str, Dict]]:
+        """Fetch metrics for up to 100 tweets in one HTTP/2 request."""
+        await self._read_bucket.acquire()
+        response = await self._http.get(
+            '/tweets',
+            params={'ids': ','.join(tweet_ids), 'tweet.fields': 'public_metrics'}
+        )
+        response.raise_for_status()
+        
+        # One collection time for the whole batch
+        collected_at = datetime.now().isoformat()
+        results = {}
+        for tweet in response.json().get('data', []):
+            metrics = tweet['public_metrics']
+            results[tweet['id']] = {
+                'likes': metrics['like_count'],
+                'retweets': metrics['retweet_count'],
+                'replies': metrics['reply_count'],
+                'quotes': metrics['quote_count'],
+                'collected_at': collected_at
+            }
+            self._metrics_cache[tweet['id']] = results[tweet['id']]
+            self._response_cache.put(ResponseCache.key('get_tweet', tweet['id']), results[tweet['id']])
+        return results
+
+    async def get_new_mentions(self, user_id: str) -> List[Dict]:
+        """
+        Get tweets mentioning a user that were posted since the previous call.
+        
+        The newest mention ID is persisted, so restarts do not re-fetch history. The first
+        call for a user only returns the latest page of mentions.
+        
+        Args:
+            user_id (str): ID of the mentioned user
+            
+        Returns:
+            List[Dict]: New mentions, newest first
         """
-        retry_count = 0
+        state_key = f"mentions_since_id|{user_id}"
+        since_id = self._since_id.get(user_id) or self._response_cache.get_state(state_key)
+        
+        self._ensure_session()
+        mentions = []
+        pagination_token = None
         while True:
-            try:
-                response = self.client.get_tweet(
-                    tweet_id,
-                    tweet_fields=['public_metrics']
-                )
-                
-                if response and 'data' in response:
-                    metrics = response['data']['public_metrics']
-                    return {
-                        'likes': metrics['like_count'],
-                        'retweets': metrics['retweet_count'],
-                        'replies': metrics['reply_count'],
-                        'quotes': metrics['quote_count'],
-                        'collected_at': datetime.now().isoformat()
-                    }
-                return None
-                
-            except tweepy.TooManyRequests:
-                if not self._handle_rate_limit(f"fetching metrics for tweet {tweet_id}", retry_count):
-                    return None
-                retry_count += 1
-                
-            except Exception as e:
-                print(f"Error fetching metrics for tweet {tweet_id}: {str(e)}")
-                if hasattr(e, 'response') and e.response is not None:
-                    print(f"Response Status: {e.response.status_code}")
-                    print(f"Response Text: {e.response.text}")
-                return None
+            page = await self._fetch_mentions_page(user_id, since_id, pagination_token)
+            if page is None:
+                return []
+            mentions.extend(page.get('data', []))
+            
+            # Page through everything newer than the cursor; without one, stop at the first page
+            pagination_token = page.get('meta', {}).get('next_token')
+            if not (since_id and pagination_token):
+                break
+        
+        if mentions:
+            newest_id = max(mentions, key=lambda tweet: int(tweet['id']))['id']
+            self._since_id[user_id] = newest_id
+            self._response_cache.set_state(state_key, newest_id)
+        
+        logger.debug("Fetched %d new mentions of %s", len(mentions), user_id)
+        return mentions
+
+    @_retry("fetching mentions")
+    async def _fetch_mentions_page(self, user_id: str, since_id: Optional[str],
+                                   pagination_token: Optional[str]) -> Dict:
+        """Fetch one page of up to 100 mentions of a user."""
+        await self._read_bucket.acquire()
+        response = await self.client.get_users_mentions(
+            user_id,
+            since_id=since_id,
+            pagination_token=pagination_token,
+            max_results=100,
+            tweet_fields=['created_at', 'author_id']
+        )
+        return response or {}
 
-    def get_trending_topics(self, woeid: int = 1) -> List[str]:
+    async def get_trending_topics(self, woeid: int = 1) -> List[str]:
         """
         Get current trending topics/hashtags with retry logic.
         Note: This still uses API v1.1 as v2 doesn't have a direct trending topics endpoint.
+        Results are cached for TRENDS_CACHE_TTL seconds, and concurrent callers share one fetch.
         
         Args:
             woeid (int): Where On Earth ID for location-based trends (default: 1 for global)
@@ -219,28 +662,35 @@ class TwitterAPI:
         Returns:
             List[str]: List of trending topics/hashtags
         """
-        retry_count = 0
-        while True:
-            try:
-                # Initialize v1.1 API for trends
-                auth = tweepy.OAuthHandler(
-                    os.getenv('TWITTER_API_KEY'),
-                    os.getenv('TWITTER_API_SECRET')
-                )
-                auth.set_access_token(
-                    os.getenv('TWITTER_ACCESS_TOKEN'),
-                    os.getenv('TWITTER_ACCESS_TOKEN_SECRET')
-                )
-                api = tweepy.API(auth)
-                
-                trends = api.get_place_trends(woeid)
-                return [trend['name'] for trend in trends[0]['trends']]
-                
-            except tweepy.TooManyRequests:
-                if not self._handle_rate_limit("fetching trending topics", retry_count):
-                    return []
-                retry_count += 1
-                
-            except tweepy.TweepyException as e:
-                print(f"Error fetching trending topics: {str(e)}")
-                return [] 
\ No newline at end of file
+        cached = self._trends_cache.get(woeid)
+        if cached is not None:
+            return cached
+        
+        if self._trends_lock is None:
+            self._trends_lock = asyncio.Lock()
+        
+        async with self._trends_lock:
+            # Another caller may have fetched the trends while this one was waiting
+            cached = self._trends_cache.get(woeid)
+            if cached is not None:
+                return cached
+            
+            # On-disk entries older than the TTL are skipped, except in replay mode
+            cache_key = ResponseCache.key('get_trends', woeid)
+            topics = self._response_cache.get(cache_key, max_age=self.TRENDS_CACHE_TTL)
+            if topics is None:
+                topics = await self._fetch_trending_topics(woeid)
+                if topics:
+                    self._response_cache.put(cache_key, topics)
+            
+            if not topics:
+                return []
+            self._trends_cache[woeid] = topics
+            return topics
+
+    @_retry("fetching trending topics")
+    async def _fetch_trending_topics(self, woeid: int) -> Optional[List[str]]:
+        """Fetch trending topics from API v1.1."""
+        # tweepy has no async v1.1 client, so run the blocking call in a worker thread
+        trends = await asyncio.to_thread(self._v1_api.get_place_trends, woeid)
+        return [trend['name'] for trend in trends[0]['trends']]